@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Load-test harness for the Discord Selfbot Channel
+
+Drives DiscordSelfbotChannel against NanoBot's in-memory MessageBus with
+discord-client.js replaced by scripts/fake-discord-client.js, so reader,
+writer and chunker changes can be compared without a Discord account.
+
+Two phases are measured:
+1. Inbound: the fake client emits messages at --rate; each is timed from
+   emission in Node until it is consumed from the bus.
+2. Outbound: --replies messages of --reply-size characters are pushed
+   through send(), round-robin over --reply-channels chats; each is timed
+   until the fake has acknowledged every chunk with a 'sent' frame. Use
+   --rate-limit to have the fake reject sends like Discord's per-channel
+   buckets and exercise the channel's pacing.
+
+Requires NanoBot (pip install nanobot) and Node.js.
+
+Usage:
+    python scripts/bench-discord-selfbot.py
+    python scripts/bench-discord-selfbot.py --messages 5000 --rate 0 --size 1500
+    python scripts/bench-discord-selfbot.py --replies 200 --reply-size 6000 --json bench.json
+    python scripts/bench-discord-selfbot.py --messages 0 --replies 20 --reply-channels 4 --rate-limit 5
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import math
+import os
+import resource
+import shutil
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from threading import Event, Lock
+
+SCRIPTS_DIR = Path(__file__).parent.resolve()
+CHANNEL_FILE = SCRIPTS_DIR / "discord-selfbot-channel.py"
+FAKE_CLIENT = SCRIPTS_DIR / "fake-discord-client.js"
+
+# Matches SENDER_ID in fake-discord-client.js. "*" covers NanoBot versions
+# that treat an empty allowlist as deny-all, the ID covers older ones.
+BENCH_ALLOW_FROM = ["*", "900000000000000001"]
+BENCH_CHAT_ID_BASE = 700000000000000000
+
+
+def load_channel_module():
+    """Import discord-selfbot-channel.py, whose filename is not importable."""
+    spec = importlib.util.spec_from_file_location("discord_selfbot_bench", CHANNEL_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty sample."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def rss_mb(maxrss: int) -> float:
+    """Convert ru_maxrss to MiB (KiB on Linux, bytes on macOS)."""
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+def summarize(count: int, elapsed: float, latencies: list[float]) -> dict:
+    return {
+        "count": count,
+        "elapsed_s": round(elapsed, 3),
+        "msgs_per_s": round(count / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(max(latencies), 3) if latencies else 0.0,
+    }
+
+
+def make_bench_channel(module):
+    """Build a DiscordSelfbotChannel subclass that observes send replies."""
+
+    class BenchChannel(module.DiscordSelfbotChannel):
+        def __init__(self, config, bus):
+            super().__init__(config, bus)
+            self.sent_lock = Lock()
+            self.sent_done = Event()
+            # chat_id -> deque of [chunks_outstanding, started_at]
+            self.pending: dict[str, deque] = {}
+            self.expected = 0
+            self.send_latencies: list[float] = []
+            self.throttled = 0
+
+        def track(self, chat_id: str, chunks: int) -> None:
+            with self.sent_lock:
+                self.pending.setdefault(chat_id, deque()).append(
+                    [chunks, time.perf_counter()]
+                )
+
+        async def _handle_python_message(self, line: str) -> None:
+            if '"type": "sent"' in line or '"type":"sent"' in line:
+                data = json.loads(line).get("data", {})
+                with self.sent_lock:
+                    queue = self.pending.get(data.get("channel_id", ""))
+                    if queue:
+                        queue[0][0] -= 1
+                        if queue[0][0] == 0:
+                            _, started = queue.popleft()
+                            self.send_latencies.append((time.perf_counter() - started) * 1000)
+                            if len(self.send_latencies) >= self.expected:
+                                self.sent_done.set()
+            elif '"retry_after"' in line:
+                self.throttled += 1
+            await super()._handle_python_message(line)
+
+    return BenchChannel
+
+
+async def run_inbound(bus, messages: int, timeout: float) -> dict:
+    """Consume inbound messages from the bus and time each from emission."""
+    latencies: list[float] = []
+    first_emitted_ms = last_consumed_ms = 0.0
+    deadline = time.monotonic() + timeout
+
+    while len(latencies) < messages and time.monotonic() < deadline:
+        try:
+            # Same 1s poll NanoBot's agent loop uses
+            msg = await asyncio.wait_for(bus.consume_inbound(), timeout=1.0)
+        except asyncio.TimeoutError:
+            continue
+        now_ms = time.time() * 1000
+        message_id = (msg.metadata or {}).get("message_id", "")
+        if not message_id.startswith("bench-"):
+            continue
+        emitted_ms = float(message_id.rsplit("-", 1)[1])
+        if not latencies:
+            first_emitted_ms = emitted_ms
+        last_consumed_ms = now_ms
+        latencies.append(now_ms - emitted_ms)
+
+    elapsed = (last_consumed_ms - first_emitted_ms) / 1000
+    result = summarize(len(latencies), elapsed, latencies)
+    result["lost"] = messages - len(latencies)
+    return result
+
+
+async def run_outbound(
+    module, channel, replies: int, reply_size: int, reply_channels: int, timeout: float
+) -> dict:
+    """Push replies through send() and time each until fully acknowledged."""
+    from nanobot.bus.events import OutboundMessage
+
+    line = ("lorem ipsum dolor sit amet " * 4).strip() + "\n"
+    content = (line * (reply_size // len(line) + 1))[:reply_size]
+    chunks = len(module._split_message(content))
+    channel.expected = replies
+    if replies == 0:
+        channel.sent_done.set()
+
+    started = time.perf_counter()
+    for i in range(replies):
+        chat_id = str(BENCH_CHAT_ID_BASE + i % max(1, reply_channels))
+        channel.track(chat_id, chunks)
+        await channel.send(
+            OutboundMessage(channel=channel.name, chat_id=chat_id, content=content)
+        )
+    await asyncio.to_thread(channel.sent_done.wait, timeout)
+    elapsed = time.perf_counter() - started
+
+    result = summarize(len(channel.send_latencies), elapsed, channel.send_latencies)
+    result["chunks_per_reply"] = chunks
+    result["chunks_per_s"] = round(len(channel.send_latencies) * chunks / elapsed, 1) if elapsed > 0 else 0.0
+    result["lost"] = replies - len(channel.send_latencies)
+    result["throttled"] = channel.throttled
+    return result
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from nanobot.bus.queue import MessageBus
+
+    module = load_channel_module()
+    os.environ.update({
+        "FAKE_DISCORD_MESSAGES": str(args.messages),
+        "FAKE_DISCORD_RATE": str(args.rate),
+        "FAKE_DISCORD_SIZE": str(args.size),
+        "FAKE_DISCORD_CHANNELS": str(args.channels),
+        "FAKE_DISCORD_SEND_LATENCY_MS": str(args.send_latency),
+        "FAKE_DISCORD_READY_DELAY_MS": str(args.ready_delay),
+        "FAKE_DISCORD_RATE_LIMIT": str(args.rate_limit),
+        "FAKE_DISCORD_RATE_WINDOW_MS": str(args.rate_window),
+    })
+
+    config = module.DiscordSelfbotConfig(
+        enabled=True,
+        token="bench-token",
+        allow_from=BENCH_ALLOW_FROM,
+        client_path=str(FAKE_CLIENT),
+        node_path=shutil.which("node") or "node",
+    )
+    bus = MessageBus()
+    channel = make_bench_channel(module)(config, bus)
+
+    cpu_start = time.process_time()
+    await channel.start()
+    try:
+        if not await channel.wait_ready(args.timeout):
+            raise RuntimeError("Fake Discord client never sent 'ready'")
+        inbound = await run_inbound(bus, args.messages, args.timeout)
+        cpu_inbound = time.process_time() - cpu_start
+        outbound = await run_outbound(
+            module, channel, args.replies, args.reply_size, args.reply_channels, args.timeout
+        )
+        cpu_outbound = time.process_time() - cpu_start - cpu_inbound
+    finally:
+        await channel.stop()
+
+    inbound["python_cpu_s"] = round(cpu_inbound, 3)
+    outbound["python_cpu_s"] = round(cpu_outbound, 3)
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    return {
+        "params": vars(args),
+        "startup_ms": round(channel.startup_time * 1000, 1),
+        "inbound": inbound,
+        "outbound": outbound,
+        "python": {
+            "cpu_s": round(self_usage.ru_utime + self_usage.ru_stime, 3),
+            "peak_rss_mb": round(rss_mb(self_usage.ru_maxrss), 1),
+        },
+        "node": {
+            "cpu_s": round(child_usage.ru_utime + child_usage.ru_stime, 3),
+            "peak_rss_mb": round(rss_mb(child_usage.ru_maxrss), 1),
+        },
+    }
+
+
+def print_report(result: dict) -> None:
+    print(f"startup   {result['startup_ms']} ms to ready")
+    for phase in ("inbound", "outbound"):
+        stats = result[phase]
+        print(f"{phase:<9} {stats['count']:>7} msgs  {stats['msgs_per_s']:>9} msg/s  "
+              f"p50 {stats['p50_ms']:>9} ms  p99 {stats['p99_ms']:>9} ms  "
+              f"lost {stats['lost']}  cpu {stats['python_cpu_s']} s"
+              + (f"  throttled {stats['throttled']}" if "throttled" in stats else ""))
+    for proc in ("python", "node"):
+        stats = result[proc]
+        print(f"{proc:<9} cpu {stats['cpu_s']} s  peak rss {stats['peak_rss_mb']} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the Discord selfbot channel")
+    parser.add_argument("--messages", type=int, default=1000, help="Inbound messages to emit")
+    parser.add_argument("--rate", type=int, default=500, help="Inbound messages per second (0 = unpaced)")
+    parser.add_argument("--size", type=int, default=200, help="Characters per inbound message")
+    parser.add_argument("--channels", type=int, default=1, help="Distinct inbound channel IDs")
+    parser.add_argument("--replies", type=int, default=100, help="Outbound replies to send")
+    parser.add_argument("--reply-size", type=int, default=4500, help="Characters per outbound reply")
+    parser.add_argument("--reply-channels", type=int, default=1, help="Chats to spread replies over")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Fake sends per channel per window (0 = none)")
+    parser.add_argument("--rate-window", type=int, default=5000, help="Fake rate-limit window (ms)")
+    parser.add_argument("--send-latency", type=int, default=0, help="Simulated Discord send latency (ms)")
+    parser.add_argument("--ready-delay", type=int, default=0, help="Simulated login time (ms)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-phase timeout (s)")
+    parser.add_argument("--json", metavar="PATH", help="Also write results as JSON")
+    args = parser.parse_args()
+
+    if not FAKE_CLIENT.exists():
+        print(f"Error: Fake client not found: {FAKE_CLIENT}")
+        sys.exit(1)
+
+    result = asyncio.run(run(args))
+    print_report(result)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"✓ Wrote results to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,34 @@
  * Handles Discord DM/Group DM communication using discord.js-selfbot-v13
  * Communicates with Python NanoBot via stdin/stdout JSONL protocol
  * 
- * Usage: node discord-client.js <user_token>
+ * Attachments never travel through the JSONL pipe: Python passes outbound
+ * files as paths in the shared spool directory, and inbound attachments are
+ * downloaded there on Python's request and reported back as paths.
+ * 
+ * Usage: node discord-client.js <user_token> [spool_dir]
  */
 
+import { createWriteStream } from 'node:fs';
+import { rename, rm } from 'node:fs/promises';
+import path from 'node:path';
+import { Readable } from 'node:stream';
+import { pipeline } from 'node:stream/promises';
 import { Client } from 'discord.js-selfbot-v13';
 
+/**
+ * Check if a REST request posts a message to a channel
+ */
+function isChannelMessagePost(info) {
+  return String(info.method).toLowerCase() === 'post' &&
+    /\/channels\/\d+\/messages$/.test(info.path || '');
+}
+
 const client = new Client({
   // Selfbot configuration
   checkUpdate: false,
+  // Fail message sends fast instead of queueing behind a rate limit, so the
+  // Python side can pace and retry each channel itself
+  rejectOnRateLimit: isChannelMessagePost,
 });
 
 let userId = '';
@@ -26,6 +46,11 @@ const stdin = process.stdin;
 
 let buffer = '';
 
+const spoolDir = process.argv[3] || '';
+
+// Per-attachment download limit when Python does not send one
+const DOWNLOAD_TIMEOUT_MS = 30000;
+
 /**
  * Send a message to Python via stdout
  */
@@ -35,10 +60,19 @@ function sendToPython(type, data) {
 }
 
 /**
- * Send an error to Python
+ * Send an error to Python, echoing the send ref so it can match the reply
  */
-function sendError(message) {
-  sendToPython('error', { message: String(message) });
+function sendError(message, ref, extra = {}) {
+  sendToPython('error', { message: String(message), ref, ...extra });
+}
+
+/**
+ * Pull retry-after (ms) out of a RateLimitError or HTTP 429 error
+ */
+function retryAfterOf(err) {
+  if (typeof err.timeout === 'number') return err.timeout;
+  if (err.httpStatus === 429 || err.status === 429) return err.retryAfter ?? 1000;
+  return undefined;
 }
 
 /**
@@ -50,6 +84,8 @@ function handlePythonMessage(line) {
     
     if (msg.type === 'send') {
       handleSendMessage(msg.data);
+    } else if (msg.type === 'download') {
+      handleDownload(msg.data);
     } else if (msg.type === 'stop') {
       handleStop();
     } else if (msg.type === 'ping') {
@@ -64,29 +100,41 @@ function handlePythonMessage(line) {
  * Handle send request from Python
  */
 async function handleSendMessage(data) {
-  const { channel_id, content, embed } = data;
+  const { channel_id, content, embed, files, ref } = data;
   
-  if (!channel_id || !content) {
-    sendError('Missing channel_id or content');
+  if (!channel_id || (!content && !files?.length)) {
+    sendError('Missing channel_id or content', ref);
     return;
   }
   
   try {
     const channel = client.channels.cache.get(channel_id);
     if (!channel) {
-      sendError(`Channel not found: ${channel_id}`);
+      sendError(`Channel not found: ${channel_id}`, ref);
       return;
     }
     
-    const payload = { content };
+    const payload = {};
+    if (content) {
+      payload.content = content;
+    }
     if (embed) {
       payload.embed = embed;
     }
+    if (files?.length) {
+      // Spool paths; discord.js streams them from disk
+      payload.files = files;
+    }
     
     await channel.send(payload);
-    sendToPython('sent', { channel_id, success: true });
+    sendToPython('sent', { channel_id, success: true, ref });
   } catch (err) {
-    sendError(`Failed to send: ${err.message}`);
+    sendError(`Failed to send: ${err.message}`, ref, {
+      channel_id,
+      retry_after: retryAfterOf(err),
+      limit: err.limit,
+      global: Boolean(err.global),
+    });
   }
 }
 
@@ -116,6 +164,63 @@ function isMentioned(content) {
   return mentionPattern.test(content);
 }
 
+/**
+ * Pass chunks through, failing once more than maxBytes have been seen
+ */
+function capBytes(maxBytes) {
+  return async function* (source) {
+    let total = 0;
+    for await (const chunk of source) {
+      total += chunk.length;
+      if (total > maxBytes) {
+        throw new Error(`larger than ${maxBytes} bytes`);
+      }
+      yield chunk;
+    }
+  };
+}
+
+/**
+ * Handle download request from Python
+ * Python only asks for attachments of messages it accepted, within its size
+ * limit; they are spooled and the local paths reported back as 'downloaded'
+ */
+async function handleDownload(data) {
+  const { message_id, attachments = [], max_bytes, timeout_ms } = data || {};
+  const maxBytes = Number(max_bytes) > 0 ? Number(max_bytes) : Infinity;
+  const timeoutMs = Number(timeout_ms) > 0 ? Number(timeout_ms) : DOWNLOAD_TIMEOUT_MS;
+  
+  const downloads = attachments.map(async (attachment) => {
+    if (!spoolDir || !attachment.url) return null;
+    
+    const safeName = (attachment.name || 'file').replace(/[^\w.-]/g, '_');
+    const dest = path.join(spoolDir, `${message_id}-${attachment.id}-${safeName}`);
+    const partial = `${dest}.part`;
+    
+    try {
+      // The signal also aborts a body that stalls mid-stream
+      const res = await fetch(attachment.url, { signal: AbortSignal.timeout(timeoutMs) });
+      if (!res.ok || !res.body) {
+        throw new Error(`HTTP ${res.status}`);
+      }
+      if (Number(res.headers.get('content-length')) > maxBytes) {
+        throw new Error(`larger than ${maxBytes} bytes`);
+      }
+      // Stream to a .part file so Python never sees a half-written attachment
+      await pipeline(Readable.fromWeb(res.body), capBytes(maxBytes), createWriteStream(partial));
+      await rename(partial, dest);
+      return dest;
+    } catch (err) {
+      console.error(`[Discord] Failed to download attachment ${attachment.name}: ${err.message}`);
+      await rm(partial, { force: true });
+      return null;
+    }
+  });
+  
+  const media = (await Promise.all(downloads)).filter(Boolean);
+  sendToPython('downloaded', { message_id, media });
+}
+
 /**
  * Format and forward incoming Discord message to Python
  */
@@ -128,7 +233,7 @@ async function handleDiscordMessage(msg) {
   
   // Ignore empty messages
   const content = msg.content?.trim() || '';
-  if (content.length === 0) return;
+  if (content.length === 0 && !msg.attachments?.size) return;
   
   const channelId = msg.channel.id;
   const senderId = msg.author.id;
@@ -153,6 +258,14 @@ async function handleDiscordMessage(msg) {
       (msg.channel.recipients && msg.channel.recipients.size > 1);
   }
   
+  // Attachment metadata only; Python requests downloads for accepted messages
+  const attachments = [...(msg.attachments?.values() || [])].map((attachment) => ({
+    id: attachment.id,
+    name: attachment.name,
+    size: attachment.size,
+    url: attachment.url,
+  }));
+  
   sendToPython('message', {
     channel_id: channelId,
     sender_id: senderId,
@@ -162,6 +275,7 @@ async function handleDiscordMessage(msg) {
     is_dm: dm,
     is_group_dm: isGroupDm,
     timestamp: timestamp,
+    attachments: attachments,
   });
 }
 
@@ -189,6 +303,19 @@ client.on('error', (err) => {
   sendError(err.message);
 });
 
+client.on('rateLimit', (info) => {
+  // Feed Python's per-channel pacing; other routes are not ours to pace
+  const match = /\/channels\/(\d+)\//.exec(info.path || '');
+  if (!info.global && !match) return;
+  
+  sendToPython('rate_limited', {
+    channel_id: match ? match[1] : '',
+    timeout: info.timeout,
+    limit: info.limit,
+    global: Boolean(info.global),
+  });
+});
+
 client.on('disconnect', () => {
   console.error('[Discord] Client disconnected');
   if (ready) {
@@ -230,7 +357,7 @@ stdin.on('end', () => {
 const token = process.argv[2];
 
 if (!token) {
-  console.error('Usage: node discord-client.js <user_token>');
+  console.error('Usage: node discord-client.js <user_token> [spool_dir]');
   process.exit(1);
 }
 
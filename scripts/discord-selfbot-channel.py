@@ -15,12 +15,19 @@ Or use the setup script: scripts/setup-discord-selfbot.py
 from __future__ import annotations
 
 import asyncio
+import itertools
 import json
 import os
+import re
+import shutil
+import stat
 import subprocess
-import sys
+import tempfile
+import time
+import uuid
+from collections import deque
 from pathlib import Path
-from threading import Thread
+from threading import Lock, Thread
 from typing import Any
 
 from loguru import logger
@@ -29,6 +36,33 @@ from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
 
+# How long send() waits for the Node.js client to log in before dropping
+READY_TIMEOUT_S = 30.0
+
+# Discord rejects messages with more attachments than this
+MAX_FILES_PER_MESSAGE = 10
+
+# Inbound attachments nobody holds a reference to are swept after this long
+SPOOL_TTL_S = 3600.0
+
+# discord-client.js gives up on an attachment download after this long
+DOWNLOAD_TIMEOUT_S = 30.0
+# A message held for its attachments is forwarded without them after this long
+DOWNLOAD_HOLD_S = DOWNLOAD_TIMEOUT_S + 15.0
+
+# Names the spool itself creates: outbound "<12 hex>-name", inbound
+# "<message_id>-<attachment_id>-name" (plus ".part" while downloading)
+SPOOL_NAME = re.compile(r"^(?:[0-9a-f]{12}|\d+-\d+)-")
+
+# Outbound pacing (see _Pacer)
+PACE_WINDOW_S = 5.0  # Assumed bucket window until feedback says otherwise
+PACE_MARGIN_S = 0.05  # Slack added to learned waits to stay just under the limit
+PACE_MAX_WINDOW_S = 60.0  # Upper bound on a learned bucket window
+PACE_LIMIT_TTL_S = 300.0  # Forget a learned limit after this long without feedback
+SENDER_IDLE_S = 60.0  # A channel's delivery task exits after this long with nothing to send
+SEND_ACK_TIMEOUT_S = 30.0  # How long a channel waits for Node's sent/error reply
+MAX_SEND_ATTEMPTS = 3  # Tries per chunk when Discord rate-limits it
+
 
 def _split_message(content: str, max_len: int = 2000) -> list[str]:
     """Split content into chunks within max_len, preferring line breaks."""
@@ -52,6 +86,184 @@ def _split_message(content: str, max_len: int = 2000) -> list[str]:
     return chunks
 
 
+def _default_spool_dir() -> str:
+    """Prefer tmpfs so attachments never touch disk; one directory per user."""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, f"nanobot-discord-selfbot-{os.getuid()}")
+
+
+class _Spool:
+    """
+    Reference-counted staging directory for files shared with the Node.js client.
+
+    Attachments cross the process boundary as paths into this directory rather
+    than inline in the JSON line protocol. Outbound files are linked or copied
+    in on acquire() and deleted when the last pending send releases them.
+    Inbound files are written here by Node and are not tracked; sweep()
+    removes them once they are older than the TTL. Only names the spool
+    creates are ever swept, so a misconfigured root cannot lose user files.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._lock = Lock()
+        self._refs: dict[str, int] = {}
+        # Source identity -> spooled path, so one file sent twice is staged once
+        self._by_source: dict[str, str] = {}
+        self._source_of: dict[str, str] = {}
+
+    def prepare(self) -> None:
+        """Create the spool, refusing a directory other users could reach into."""
+        if not self.root.is_absolute():
+            raise OSError(f"not an absolute path: {self.root}")
+        self.root.mkdir(mode=0o700, parents=True, exist_ok=True)
+        st = os.lstat(self.root)
+        if not stat.S_ISDIR(st.st_mode):
+            raise OSError(f"not a directory: {self.root}")
+        if st.st_uid != os.getuid() or stat.S_IMODE(st.st_mode) & 0o077:
+            raise PermissionError(f"must be owned by this user with mode 0700: {self.root}")
+
+    def acquire(self, source: str) -> str | None:
+        """Stage source in the spool and return its spooled path."""
+        try:
+            src = Path(source).resolve()
+            st = src.stat()
+        except OSError as e:
+            logger.warning(f"Discord attachment not readable: {source} ({e})")
+            return None
+        key = f"{src}:{st.st_size}:{st.st_mtime_ns}"
+
+        with self._lock:
+            path = self._by_source.get(key)
+            if path:
+                self._refs[path] += 1
+                return path
+
+            dest = self.root / f"{uuid.uuid4().hex[:12]}-{src.name}"
+            try:
+                # Hard link when on the same filesystem, otherwise copy
+                try:
+                    os.link(src, dest)
+                except OSError:
+                    shutil.copyfile(src, dest)
+            except OSError as e:
+                logger.warning(f"Failed to spool Discord attachment {source}: {e}")
+                return None
+
+            path = str(dest)
+            self._refs[path] = 1
+            self._by_source[key] = path
+            self._source_of[path] = key
+            return path
+
+    def release(self, path: str) -> None:
+        """Drop one reference, deleting the spooled file at zero."""
+        with self._lock:
+            refs = self._refs.get(path, 0) - 1
+            if refs > 0:
+                self._refs[path] = refs
+                return
+            self._refs.pop(path, None)
+            self._by_source.pop(self._source_of.pop(path, ""), None)
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to remove spooled attachment {path}: {e}")
+
+    def sweep(self, max_age: float) -> None:
+        """Remove untracked spool files older than max_age seconds."""
+        cutoff = time.time() - max_age
+        try:
+            entries = list(os.scandir(self.root))
+        except OSError:
+            return
+        with self._lock:
+            tracked = set(self._refs)
+        for entry in entries:
+            try:
+                if (
+                    SPOOL_NAME.match(entry.name)
+                    and entry.path not in tracked
+                    and entry.is_file(follow_symlinks=False)
+                    and entry.stat(follow_symlinks=False).st_mtime < cutoff
+                ):
+                    os.unlink(entry.path)
+            except OSError:
+                pass
+
+
+class _Pacer:
+    """
+    Learned send budget for one Discord channel.
+
+    Starts unlimited. Rate-limit feedback from discord-client.js teaches it
+    how many messages the channel's bucket allows per window; from then on
+    bursts go out up to that limit and later chunks wait for the oldest send
+    to age out of the window, instead of being sent, rejected and retried.
+    A learned limit is forgotten after PACE_LIMIT_TTL_S without new feedback.
+    """
+
+    def __init__(self) -> None:
+        self.limit: int | None = None
+        self.window = PACE_WINDOW_S
+        self.blocked_until = 0.0
+        self._learned_at = 0.0
+        # Monotonic times of recent successful sends
+        self._sent: deque[float] = deque(maxlen=100)
+
+    def delay(self, now: float) -> float:
+        """Seconds to wait before the next send may go out."""
+        self._expire(now)
+        wait = self.blocked_until - now
+        if self.limit:
+            recent = self._recent(now)
+            if len(recent) >= self.limit:
+                wait = max(wait, recent[-self.limit] + self.window + PACE_MARGIN_S - now)
+        return max(0.0, wait)
+
+    def delivered(self, now: float) -> None:
+        self._sent.append(now)
+
+    def block(self, now: float, retry_after: float) -> None:
+        """Hold all sends until retry_after seconds from now."""
+        self.blocked_until = max(self.blocked_until, now + retry_after + PACE_MARGIN_S)
+
+    def rate_limited(self, now: float, retry_after: float, limit: Any = None) -> None:
+        """Learn from a rate limit on this channel that resets retry_after from now."""
+        self.block(now, retry_after)
+        recent = self._recent(now)
+        if not isinstance(limit, int) or limit <= 0:
+            # No usable bucket size (discord.js reports -1 before it knows):
+            # assume what got through was the most it allows, if anything did
+            limit = len(recent) or self.limit
+        if not limit:
+            return
+        self.limit = limit
+        self._learned_at = now
+        if len(recent) >= limit:
+            # The bucket held the last `limit` sends and resets after
+            # retry_after, so its window spans from the oldest of them.
+            # Only sends inside the assumed window count, so stale history
+            # cannot stretch it.
+            learned = now - recent[-limit] + retry_after
+            self.window = min(learned, max(PACE_WINDOW_S, retry_after), PACE_MAX_WINDOW_S)
+
+    def idle(self, now: float) -> bool:
+        """Whether this pacer holds nothing worth keeping."""
+        self._expire(now)
+        return self.limit is None and self.blocked_until <= now
+
+    def _recent(self, now: float) -> list[float]:
+        return [t for t in self._sent if t > now - self.window]
+
+    def _expire(self, now: float) -> None:
+        if self.limit is not None and now - self._learned_at > PACE_LIMIT_TTL_S:
+            self.limit = None
+            self.window = PACE_WINDOW_S
+
+
 class DiscordSelfbotConfig:
     """Discord selfbot channel configuration."""
 
@@ -61,6 +273,9 @@ class DiscordSelfbotConfig:
         token: str = "",
         allow_from: list[str] | None = None,
         client_path: str = "",
+        node_path: str = "",
+        spool_dir: str = "",
+        max_attachment_mb: float = 10.0,
     ):
         self.enabled = enabled
         self.token = token
@@ -69,6 +284,13 @@ class DiscordSelfbotConfig:
         self.client_path = client_path or str(
             Path(__file__).parent.parent.parent / "scripts" / "discord-client.js"
         )
+        # Path to node binary, resolved by setup-discord-selfbot.py preflight
+        self.node_path = node_path
+        # Directory shared with discord-client.js for attachments
+        # (empty = per-user directory under /dev/shm)
+        self.spool_dir = spool_dir
+        # Inbound attachments larger than this are not downloaded
+        self.max_attachment_mb = max_attachment_mb
 
 
 class DiscordSelfbotChannel(BaseChannel):
@@ -80,6 +302,18 @@ class DiscordSelfbotChannel(BaseChannel):
     2. Communicating via stdin/stdout JSON messages
     3. Forwarding incoming messages to NanoBot's message bus
     4. Sending outgoing messages from NanoBot to Discord
+
+    start() returns as soon as the subprocess is spawned; await wait_ready()
+    to block until the client has logged in. send() does this itself.
+
+    Attachments in both directions are passed as paths into a shared spool
+    directory (see _Spool) so binaries never travel through the JSON pipe.
+    Inbound attachments are only downloaded, on request, for messages from
+    allowed senders and within max_attachment_mb.
+
+    Outbound chunks are queued per Discord channel and delivered by one task
+    per channel, paced by rate-limit feedback (see _Pacer). Channels run in
+    parallel; within a channel each chunk waits for Node's sent/error reply.
     """
 
     name = "discord_selfbot"
@@ -92,6 +326,31 @@ class DiscordSelfbotChannel(BaseChannel):
         self._running = False
         self._user_id: str = ""
         self._username: str = ""
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._ready = asyncio.Event()
+        # Set when the client's stdout closes, so waiters stop hoping for 'ready'
+        self._exited = asyncio.Event()
+        self._spawned_at: float = 0.0
+        # Seconds from spawn to the client's 'ready' frame
+        self.startup_time: float | None = None
+        # Schema models carry spool_dir="" rather than our default
+        self._spool = _Spool(config.spool_dir or _default_spool_dir())
+        self._last_sweep: float = 0.0
+        # Send ref -> spooled files to release once the chunk is settled
+        self._pending_files: dict[str, list[str]] = {}
+        self._refs = itertools.count(1)
+        # message_id -> message frame held back until Node has spooled its attachments
+        self._pending_inbound: dict[str, dict[str, Any]] = {}
+        # stdin is written from the event loop and the reader thread
+        self._stdin_lock = Lock()
+        # Per-channel outbound queues, delivery tasks and pacing
+        self._queues: dict[str, asyncio.Queue[dict[str, Any]]] = {}
+        self._senders: dict[str, asyncio.Task] = {}
+        self._pacers: dict[str, _Pacer] = {}
+        # Global rate limit: no channel sends before this monotonic time
+        self._blocked_until = 0.0
+        # Send ref -> future resolved with (ok, data) by Node's reply
+        self._acks: dict[str, asyncio.Future] = {}
         
         # Map sender_id to channel_id for replies (like Telegram)
         self._channel_map: dict[str, str] = {}
@@ -107,34 +366,36 @@ class DiscordSelfbotChannel(BaseChannel):
             logger.error(f"Discord client script not found: {client_path}")
             return
 
+        node_path = self.config.node_path or shutil.which("node") or "node"
+
+        try:
+            self._spool.prepare()
+            self._spool.sweep(SPOOL_TTL_S)
+        except OSError as e:
+            logger.error(f"Discord spool directory unusable: {self._spool.root} ({e})")
+            return
+
         self._running = True
+        self._loop = asyncio.get_running_loop()
+        self._ready.clear()
+        self._exited.clear()
+        self.startup_time = None
 
-        # Spawn Node.js subprocess
+        # Spawn Node.js subprocess. stderr is inherited so the client's
+        # logging reaches our logs instead of filling an unread pipe.
         try:
+            self._spawned_at = time.monotonic()
             self._process = subprocess.Popen(
-                [sys.executable, "-m", "node", client_path, self.config.token],
-                # Use node directly since script has shebang
-                # Actually let's use node directly
+                [node_path, client_path, self.config.token, str(self._spool.root)],
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
                 text=True,
                 bufsize=1,
             )
-        except Exception as e:
-            # Try with node directly
-            try:
-                self._process = subprocess.Popen(
-                    ["node", client_path, self.config.token],
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    bufsize=1,
-                )
-            except Exception as e2:
-                logger.error(f"Failed to start Discord client: {e2}")
-                return
+        except OSError as e:
+            logger.error(f"Failed to start Discord client with {node_path}: {e}")
+            self._running = False
+            return
 
         # Start reader thread for stdout
         self._reader_thread = Thread(target=self._read_stdout, daemon=True)
@@ -142,6 +403,33 @@ class DiscordSelfbotChannel(BaseChannel):
 
         logger.info("Discord selfbot channel started")
 
+    @property
+    def is_ready(self) -> bool:
+        """Whether the Node.js client has logged in."""
+        return self._ready.is_set()
+
+    async def wait_ready(self, timeout: float | None = None) -> bool:
+        """Wait until the Node.js client has logged in.
+
+        Returns False if it has not done so within timeout seconds, and
+        immediately if the channel is stopped or the client has exited.
+        """
+        if self._ready.is_set():
+            return True
+        if not self._running or not self._process or self._process.poll() is not None:
+            return False
+
+        waiters = {
+            asyncio.ensure_future(self._ready.wait()),
+            asyncio.ensure_future(self._exited.wait()),
+        }
+        _, pending = await asyncio.wait(
+            waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+        for waiter in pending:
+            waiter.cancel()
+        return self._ready.is_set()
+
     def _read_stdout(self) -> None:
         """Read stdout from Node.js process in background thread."""
         if not self._process or not self._process.stdout:
@@ -163,6 +451,15 @@ class DiscordSelfbotChannel(BaseChannel):
                 logger.error(f"Error reading stdout: {e}")
                 break
 
+        if self._running:
+            try:
+                code = self._process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                code = None
+            logger.warning(f"Discord client exited (code {code})")
+        if self._loop and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._exited.set)
+
     async def _handle_python_message(self, line: str) -> None:
         """Handle incoming message from Node.js subprocess."""
         try:
@@ -173,13 +470,36 @@ class DiscordSelfbotChannel(BaseChannel):
             if msg_type == "ready":
                 self._user_id = data.get("user_id", "")
                 self._username = data.get("username", "")
-                logger.info(f"Discord selfbot logged in as {self._username}")
+                self.startup_time = time.monotonic() - self._spawned_at
+                logger.info(
+                    f"Discord selfbot logged in as {self._username} "
+                    f"in {self.startup_time:.2f}s"
+                )
+                # Runs on the reader thread's loop; wake waiters on ours
+                if self._loop:
+                    self._loop.call_soon_threadsafe(self._ready.set)
 
             elif msg_type == "message":
                 await self._handle_incoming_message(data)
 
+            elif msg_type == "downloaded":
+                held = self._pending_inbound.pop(data.get("message_id", ""), None)
+                if held:
+                    held["attachments"] = []
+                    held["media"] = data.get("media") or []
+                    await self._handle_incoming_message(held)
+
+            elif msg_type == "sent":
+                self._settle_ack(data, True)
+
             elif msg_type == "error":
-                logger.error(f"Discord error: {data.get('message')}")
+                # Send failures are reported by the channel's delivery task
+                if not self._settle_ack(data, False):
+                    logger.error(f"Discord error: {data.get('message')}")
+
+            elif msg_type == "rate_limited":
+                if self._loop:
+                    self._loop.call_soon_threadsafe(self._apply_rate_limit, data)
 
             elif msg_type == "disconnected":
                 logger.warning("Discord client disconnected")
@@ -195,6 +515,8 @@ class DiscordSelfbotChannel(BaseChannel):
         content = data.get("content", "")
         message_id = data.get("message_id", "")
         is_dm = data.get("is_dm", False)
+        media = [p for p in data.get("media") or [] if isinstance(p, str)]
+        attachments = [a for a in data.get("attachments") or [] if isinstance(a, dict)]
 
         if not channel_id or not sender_id:
             return
@@ -207,14 +529,59 @@ class DiscordSelfbotChannel(BaseChannel):
 
         logger.debug(f"Discord message from {sender_name}: {content[:50]}...")
 
+        # Only spend spool space on attachments we will actually forward
+        if attachments and self.is_allowed(full_sender_id):
+            max_bytes = int(self.config.max_attachment_mb * 1024 * 1024)
+            wanted = [a for a in attachments if 0 <= (a.get("size") or 0) <= max_bytes]
+            if len(wanted) < len(attachments):
+                logger.info(
+                    f"Skipping {len(attachments) - len(wanted)} Discord attachment(s) "
+                    f"over {self.config.max_attachment_mb} MB from {sender_name}"
+                )
+            if wanted and message_id:
+                self._pending_inbound[message_id] = data
+                try:
+                    self._write_frame({
+                        "type": "download",
+                        "data": {
+                            "message_id": message_id,
+                            "attachments": wanted,
+                            "max_bytes": max_bytes,
+                            "timeout_ms": int(DOWNLOAD_TIMEOUT_S * 1000),
+                        },
+                    })
+                    # Runs on the reader thread's loop; time out on ours
+                    if self._loop:
+                        self._loop.call_soon_threadsafe(
+                            self._loop.call_later, DOWNLOAD_HOLD_S,
+                            self._expire_inbound, message_id,
+                        )
+                    return
+                except Exception as e:
+                    self._pending_inbound.pop(message_id, None)
+                    logger.error(f"Failed to request Discord attachments: {e}")
+
+        # Attachment-only message whose attachments were all skipped or failed
+        if not content and not media:
+            logger.debug(f"Dropping empty Discord message {message_id} from {sender_name}")
+            return
+
         # Start typing indicator
         # (Optional: can be implemented by sending to Node.js)
 
+        # Attachments were already written to the spool by Node
+        if media:
+            content = "\n".join([content] + [f"[attachment: {p}]" for p in media]).strip()
+            if time.monotonic() - self._last_sweep > 60:
+                self._last_sweep = time.monotonic()
+                self._spool.sweep(SPOOL_TTL_S)
+
         # Forward to message bus
         await self._handle_message(
             sender_id=full_sender_id,
             chat_id=channel_id,
             content=content,
+            media=media,
             metadata={
                 "message_id": message_id,
                 "is_dm": is_dm,
@@ -222,15 +589,28 @@ class DiscordSelfbotChannel(BaseChannel):
             },
         )
 
+    def _expire_inbound(self, message_id: str) -> None:
+        """Forward a held message without attachments Node never reported."""
+        held = self._pending_inbound.pop(message_id, None)
+        if not held:
+            return
+        logger.warning(f"Discord attachments for message {message_id} timed out; forwarding without them")
+        held["attachments"] = []
+        held["media"] = []
+        asyncio.ensure_future(self._handle_incoming_message(held))
+
     async def stop(self) -> None:
         """Stop the Discord selfbot channel."""
         self._running = False
+        self._ready.clear()
+        self._exited.set()
+
+        self._pending_inbound.clear()
 
         # Send stop command to Node.js
         if self._process and self._process.stdin:
             try:
-                self._process.stdin.write(json.dumps({"type": "stop"}) + "\n")
-                self._process.stdin.flush()
+                self._write_frame({"type": "stop"})
             except Exception:
                 pass
 
@@ -244,6 +624,14 @@ class DiscordSelfbotChannel(BaseChannel):
             except Exception as e:
                 logger.warning(f"Error stopping Discord process: {e}")
 
+        # Node will never acknowledge these now
+        for task in self._senders.values():
+            task.cancel()
+        self._senders.clear()
+        self._queues.clear()
+        for ref in list(self._pending_files):
+            self._release_files(ref)
+
         logger.info("Discord selfbot channel stopped")
 
     async def send(self, msg: OutboundMessage) -> None:
@@ -254,27 +642,163 @@ class DiscordSelfbotChannel(BaseChannel):
 
         channel_id = msg.chat_id
         content = msg.content or ""
+        media = msg.media or []
 
-        if not channel_id or not content:
+        if not channel_id or not (content or media):
             return
 
-        # Split long messages
-        chunks = _split_message(content)
-        if not chunks:
+        # Messages written before login hit an empty channel cache in Node
+        if not await self.wait_ready(READY_TIMEOUT_S):
+            logger.warning(f"Discord client not ready, dropping message to {channel_id}")
             return
 
-        for chunk in chunks:
-            payload = {
-                "type": "send",
-                "data": {
-                    "channel_id": channel_id,
-                    "content": chunk,
-                },
+        # Split long messages; attachments ride on the last chunk, and any
+        # beyond Discord's per-message limit follow as file-only messages
+        frames: list[tuple[str, list[str]]] = [(chunk, []) for chunk in _split_message(content)]
+        for i in range(0, len(media), MAX_FILES_PER_MESSAGE):
+            group = media[i:i + MAX_FILES_PER_MESSAGE]
+            if i == 0 and frames:
+                frames[-1] = (frames[-1][0], group)
+            else:
+                frames.append(("", group))
+
+        for chunk, files in frames:
+            ref = str(next(self._refs))
+            data: dict[str, Any] = {
+                "channel_id": channel_id,
+                "content": chunk,
+                "ref": ref,
             }
-
+            spooled = self._spool_files(ref, files)
+            if spooled:
+                data["files"] = spooled
+            elif not chunk:
+                continue
+            self._enqueue(channel_id, data)
+
+    def _enqueue(self, channel_id: str, data: dict[str, Any]) -> None:
+        """Queue a send frame behind earlier ones for the same channel."""
+        queue = self._queues.get(channel_id)
+        if queue is None:
+            queue = self._queues[channel_id] = asyncio.Queue()
+            self._senders[channel_id] = asyncio.create_task(self._deliver(channel_id, queue))
+        queue.put_nowait(data)
+
+    async def _deliver(self, channel_id: str, queue: asyncio.Queue[dict[str, Any]]) -> None:
+        """Deliver one channel's frames in order, paced by its learned budget."""
+        pacer = self._pacers.setdefault(channel_id, _Pacer())
+        while self._running:
             try:
-                self._process.stdin.write(json.dumps(payload) + "\n")
-                self._process.stdin.flush()
+                data = await asyncio.wait_for(queue.get(), SENDER_IDLE_S)
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    self._retire_sender(channel_id)
+                    return
+                continue
+            try:
+                await self._deliver_frame(channel_id, pacer, data)
             except Exception as e:
                 logger.error(f"Failed to send Discord message: {e}")
-                break
+            finally:
+                self._release_files(data["ref"])
+
+    def _retire_sender(self, channel_id: str) -> None:
+        """Forget an idle channel, keeping pacers that still hold learned state."""
+        self._queues.pop(channel_id, None)
+        self._senders.pop(channel_id, None)
+        now = time.monotonic()
+        for cid in [c for c, p in self._pacers.items() if c not in self._queues and p.idle(now)]:
+            del self._pacers[cid]
+
+    async def _deliver_frame(self, channel_id: str, pacer: _Pacer, data: dict[str, Any]) -> None:
+        ref = data["ref"]
+        frame = {"type": "send", "data": data}
+
+        for _ in range(MAX_SEND_ATTEMPTS):
+            now = time.monotonic()
+            delay = max(pacer.delay(now), self._blocked_until - now)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            if not self._process or not self._process.stdin:
+                logger.warning("Discord process not running")
+                return
+
+            ack = asyncio.get_running_loop().create_future()
+            self._acks[ref] = ack
+            try:
+                self._write_frame(frame)
+                ok, reply = await asyncio.wait_for(ack, SEND_ACK_TIMEOUT_S)
+            except asyncio.TimeoutError:
+                logger.warning(f"No reply from Discord client for message to {channel_id}")
+                return
+            finally:
+                self._acks.pop(ref, None)
+
+            if ok:
+                pacer.delivered(time.monotonic())
+                return
+
+            retry_after = reply.get("retry_after")
+            if retry_after is None:
+                logger.error(f"Discord error: {reply.get('message')}")
+                return
+            if reply.get("global"):
+                self._block_all(retry_after / 1000)
+            else:
+                pacer.rate_limited(time.monotonic(), retry_after / 1000, reply.get("limit"))
+
+        logger.error(
+            f"Discord kept rate-limiting message to {channel_id}, "
+            f"gave up after {MAX_SEND_ATTEMPTS} attempts"
+        )
+
+    def _write_frame(self, frame: dict[str, Any]) -> None:
+        """Write one JSONL frame to the Node.js client."""
+        line = json.dumps(frame) + "\n"
+        with self._stdin_lock:
+            self._process.stdin.write(line)
+            self._process.stdin.flush()
+
+    def _settle_ack(self, data: dict[str, Any], ok: bool) -> bool:
+        """Hand Node's reply to the delivery task waiting on it (reader thread)."""
+        ack = self._acks.get(data.get("ref") or "")
+        if not ack or not self._loop:
+            return False
+
+        def settle() -> None:
+            if not ack.done():
+                ack.set_result((ok, data))
+
+        self._loop.call_soon_threadsafe(settle)
+        return True
+
+    def _apply_rate_limit(self, data: dict[str, Any]) -> None:
+        """Feed a rate_limited frame from Node into the affected pacers."""
+        retry_after = (data.get("timeout") or 0) / 1000
+        if data.get("global"):
+            # The global bucket says nothing about any one channel's limit
+            self._block_all(retry_after)
+            return
+        # Only channels we are sending to; others would pile up pacers
+        pacer = self._pacers.get(data.get("channel_id", ""))
+        if pacer:
+            pacer.rate_limited(time.monotonic(), retry_after, data.get("limit"))
+
+    def _block_all(self, retry_after: float) -> None:
+        """Hold every channel, including ones not sending yet, for retry_after."""
+        self._blocked_until = max(
+            self._blocked_until, time.monotonic() + retry_after + PACE_MARGIN_S
+        )
+
+    def _spool_files(self, ref: str, files: list[str]) -> list[str]:
+        """Stage files for one send frame, to be released under its ref."""
+        spooled = [p for p in (self._spool.acquire(f) for f in files) if p]
+        if spooled:
+            self._pending_files[ref] = spooled
+        return spooled
+
+    def _release_files(self, ref: str | None) -> None:
+        """Release the spooled files of a send frame that has been settled."""
+        for path in self._pending_files.pop(ref, []) if ref else []:
+            self._spool.release(path)
@@ -0,0 +1,258 @@
+#!/usr/bin/env node
+
+/**
+ * Fake Discord Client for benchmarking the selfbot channel
+ *
+ * Stand-in for discord-client.js that never talks to Discord. Speaks the
+ * same stdin/stdout JSONL protocol (starting, ready, message, send, sent,
+ * ping/pong, stop) and emits inbound messages at a configurable rate and
+ * size so the Python channel can be load-tested without a real account.
+ *
+ * Usage: node fake-discord-client.js <any_token> [spool_dir]
+ *
+ * Configuration (environment):
+ *   FAKE_DISCORD_MESSAGES          Inbound messages to emit (default 1000)
+ *   FAKE_DISCORD_RATE              Inbound messages per second, 0 = unpaced (default 500)
+ *   FAKE_DISCORD_SIZE              Characters of content per message (default 200)
+ *   FAKE_DISCORD_CHANNELS          Distinct channel IDs to spread messages over (default 1)
+ *   FAKE_DISCORD_READY_DELAY_MS    Simulated login time before 'ready' (default 0)
+ *   FAKE_DISCORD_SEND_LATENCY_MS   Simulated channel.send() latency (default 0)
+ *   FAKE_DISCORD_RATE_LIMIT        Sends allowed per channel per window, 0 = unlimited (default 0)
+ *   FAKE_DISCORD_RATE_WINDOW_MS    Rate-limit bucket window (default 5000)
+ *
+ * Sends over the rate limit are rejected the way discord-client.js reports a
+ * RateLimitError: a 'rate_limited' frame followed by an 'error' carrying
+ * retry_after and limit.
+ */
+
+import { existsSync } from 'node:fs';
+import { performance } from 'node:perf_hooks';
+
+const MESSAGES = intFromEnv('FAKE_DISCORD_MESSAGES', 1000);
+const RATE = intFromEnv('FAKE_DISCORD_RATE', 500);
+const SIZE = intFromEnv('FAKE_DISCORD_SIZE', 200);
+const CHANNELS = Math.max(1, intFromEnv('FAKE_DISCORD_CHANNELS', 1));
+const READY_DELAY_MS = intFromEnv('FAKE_DISCORD_READY_DELAY_MS', 0);
+const SEND_LATENCY_MS = intFromEnv('FAKE_DISCORD_SEND_LATENCY_MS', 0);
+const RATE_LIMIT = intFromEnv('FAKE_DISCORD_RATE_LIMIT', 0);
+const RATE_WINDOW_MS = intFromEnv('FAKE_DISCORD_RATE_WINDOW_MS', 5000);
+
+const USER_ID = '900000000000000000';
+const USERNAME = 'bench-bot';
+const SENDER_ID = '900000000000000001';
+const SENDER_NAME = 'bench-user';
+
+const stdout = process.stdout;
+const stdin = process.stdin;
+
+let buffer = '';
+let emitted = 0;
+let draining = null;
+
+// channel_id -> { resetAt, remaining }, modelled on Discord's message buckets
+const buckets = new Map();
+
+function intFromEnv(name, fallback) {
+  const value = parseInt(process.env[name] ?? '', 10);
+  return Number.isNaN(value) ? fallback : value;
+}
+
+/**
+ * Wall-clock milliseconds with sub-millisecond precision, comparable
+ * with Python's time.time() * 1000 on the same host
+ */
+function nowMs() {
+  return performance.timeOrigin + performance.now();
+}
+
+/**
+ * Send a message to Python via stdout, reporting whether the pipe is full
+ */
+function sendToPython(type, data) {
+  const msg = JSON.stringify({ type, data });
+  return stdout.write(msg + '\n');
+}
+
+function sendError(message, ref, extra = {}) {
+  sendToPython('error', { message: String(message), ref, ...extra });
+}
+
+/**
+ * Wait for stdout to drain so a slow reader applies backpressure
+ */
+function waitForDrain() {
+  if (!draining) {
+    draining = new Promise((resolve) => {
+      stdout.once('drain', () => {
+        draining = null;
+        resolve();
+      });
+    });
+  }
+  return draining;
+}
+
+function handlePythonMessage(line) {
+  try {
+    const msg = JSON.parse(line);
+
+    if (msg.type === 'send') {
+      handleSendMessage(msg.data);
+    } else if (msg.type === 'stop') {
+      handleStop();
+    } else if (msg.type === 'ping') {
+      sendToPython('pong', {});
+    }
+  } catch (err) {
+    console.error('[FakeDiscord] Failed to parse Python message:', err.message);
+  }
+}
+
+/**
+ * Acknowledge a send the same way discord-client.js does after channel.send()
+ */
+function handleSendMessage(data) {
+  const { channel_id, content, files, ref } = data || {};
+
+  if (!channel_id || (!content && !files?.length)) {
+    sendError('Missing channel_id or content', ref);
+    return;
+  }
+
+  const missing = (files || []).find((file) => !existsSync(file));
+  if (missing) {
+    sendError(`Failed to send: attachment not found: ${missing}`, ref);
+    return;
+  }
+
+  if (RATE_LIMIT > 0) {
+    const now = performance.now();
+    let bucket = buckets.get(channel_id);
+    if (!bucket || now >= bucket.resetAt) {
+      bucket = { resetAt: now + RATE_WINDOW_MS, remaining: RATE_LIMIT };
+      buckets.set(channel_id, bucket);
+    }
+    if (bucket.remaining <= 0) {
+      const timeout = Math.ceil(bucket.resetAt - now);
+      sendToPython('rate_limited', { channel_id, timeout, limit: RATE_LIMIT, global: false });
+      sendError('Failed to send: You are being rate limited.', ref, {
+        channel_id,
+        retry_after: timeout,
+        limit: RATE_LIMIT,
+      });
+      return;
+    }
+    bucket.remaining -= 1;
+  }
+
+  const ack = () => sendToPython('sent', { channel_id, success: true, length: content.length, ref });
+  if (SEND_LATENCY_MS > 0) {
+    setTimeout(ack, SEND_LATENCY_MS);
+  } else {
+    ack();
+  }
+}
+
+function handleStop() {
+  console.error('[FakeDiscord] Received stop signal');
+  process.exit(0);
+}
+
+/**
+ * Build one inbound message frame. The emit time is encoded in message_id
+ * because it is the only per-message field the channel forwards verbatim.
+ */
+function buildMessage(seq) {
+  const prefix = `bench message ${seq} `;
+  const content = prefix.length >= SIZE
+    ? prefix.substring(0, Math.max(1, SIZE))
+    : prefix + 'x'.repeat(SIZE - prefix.length);
+
+  return {
+    channel_id: `8000000000000${String(seq % CHANNELS).padStart(5, '0')}`,
+    sender_id: SENDER_ID,
+    sender_name: SENDER_NAME,
+    content,
+    message_id: `bench-${seq}-${nowMs().toFixed(3)}`,
+    is_dm: true,
+    is_group_dm: false,
+    timestamp: new Date().toISOString(),
+  };
+}
+
+/**
+ * Emit inbound messages on a fixed schedule, catching up in bursts when
+ * timers fire late and pausing whenever stdout is backed up
+ */
+async function emitMessages() {
+  const start = performance.now();
+
+  while (emitted < MESSAGES) {
+    const due = RATE > 0
+      ? Math.min(MESSAGES, Math.floor(((performance.now() - start) / 1000) * RATE) + 1)
+      : Math.min(MESSAGES, emitted + 100);
+
+    while (emitted < due) {
+      const ok = sendToPython('message', buildMessage(emitted));
+      emitted += 1;
+      if (!ok) {
+        await waitForDrain();
+      }
+    }
+
+    if (RATE > 0 && emitted < MESSAGES) {
+      const nextAt = start + (emitted / RATE) * 1000;
+      await new Promise((resolve) => setTimeout(resolve, Math.max(0, nextAt - performance.now())));
+    } else {
+      await new Promise((resolve) => setImmediate(resolve));
+    }
+  }
+
+  console.error(`[FakeDiscord] Emitted ${emitted} messages`);
+}
+
+// IPC Setup
+
+stdin.setEncoding('utf8');
+
+stdin.on('data', (chunk) => {
+  buffer += chunk;
+
+  let newlineIndex;
+  while ((newlineIndex = buffer.indexOf('\n')) !== -1) {
+    const line = buffer.substring(0, newlineIndex);
+    buffer = buffer.substring(newlineIndex + 1);
+
+    if (line.trim()) {
+      handlePythonMessage(line);
+    }
+  }
+});
+
+stdin.on('end', () => {
+  console.error('[FakeDiscord] stdin ended');
+  handleStop();
+});
+
+// Startup
+
+const token = process.argv[2];
+
+if (!token) {
+  console.error('Usage: node fake-discord-client.js <any_token>');
+  process.exit(1);
+}
+
+console.error('[FakeDiscord] Starting client...');
+sendToPython('starting', {});
+
+setTimeout(() => {
+  sendToPython('ready', {
+    user_id: USER_ID,
+    username: USERNAME,
+  });
+  emitMessages().catch((err) => sendError(err.message));
+}, READY_DELAY_MS);
+
+process.on('SIGINT', handleStop);
+process.on('SIGTERM', handleStop);
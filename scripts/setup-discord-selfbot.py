@@ -6,18 +6,34 @@ This script installs the Discord selfbot channel into NanoBot by:
 1. Copying the channel file to the correct location
 2. Adding config schema entries
 3. Adding channel initialization to manager.py
+4. Running a preflight that resolves the node binary, checks that
+   discord.js-selfbot-v13 loads, and writes the resolved paths into the
+   NanoBot config so the channel can spawn the client directly
 
 Usage:
-    python scripts/setup-discord-selfbot.py [--uninstall]
+    python scripts/setup-discord-selfbot.py [--uninstall] [--preflight] [--config PATH]
 """
 
 import argparse
+import json
 import os
 import re
 import shutil
+import subprocess
 import sys
+import time
+from datetime import datetime
 from pathlib import Path
 
+DEFAULT_CONFIG = Path.home() / ".nanobot" / "config.json"
+
+# DiscordSelfbotConfig fields newer than client_path, in schema order
+SCHEMA_FIELDS = [
+    ("node_path", '    node_path: str = ""  # Path to node binary (written by preflight)\n'),
+    ("spool_dir", '    spool_dir: str = ""  # Shared attachment directory (default: /dev/shm)\n'),
+    ("max_attachment_mb", '    max_attachment_mb: float = 10.0  # Larger inbound attachments are skipped\n'),
+]
+
 
 def get_site_packages() -> Path:
     """Find the site-packages directory where nanobot is installed."""
@@ -46,7 +62,83 @@ def get_site_packages() -> Path:
     raise RuntimeError("Could not find site-packages directory")
 
 
-def install_channel() -> None:
+def run_preflight(config_file: Path) -> None:
+    """Resolve node, check the selfbot library loads, and record the results."""
+    project_root = Path(__file__).parent.parent.resolve()
+    client_path = project_root / "scripts" / "discord-client.js"
+
+    if not client_path.exists():
+        print(f"Error: Discord client script not found: {client_path}")
+        sys.exit(1)
+
+    # which() is already absolute; resolving symlinks would break version
+    # manager and snap shims that dispatch on the name they are called by
+    node_path = shutil.which("node")
+    if not node_path:
+        print("Error: node not found in PATH - install Node.js first")
+        sys.exit(1)
+
+    timings: dict[str, float] = {}
+
+    # 1. Cost of spawning node at all
+    start = time.perf_counter()
+    result = subprocess.run([node_path, "--version"], capture_output=True, text=True)
+    timings["node_spawn_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    if result.returncode != 0:
+        print(f"Error: {node_path} --version failed: {result.stderr.strip()}")
+        sys.exit(1)
+    node_version = result.stdout.strip()
+    print(f"✓ Found node {node_version} at {node_path} ({timings['node_spawn_ms']:.0f} ms)")
+
+    # 2. Cost of loading discord.js-selfbot-v13, resolved like discord-client.js does
+    start = time.perf_counter()
+    result = subprocess.run(
+        [node_path, "--input-type=module", "-e", "await import('discord.js-selfbot-v13');"],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+    )
+    timings["module_load_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    if result.returncode != 0:
+        print(f"Error: discord.js-selfbot-v13 failed to load:\n{result.stderr.strip()}")
+        print(f"Run `npm install` in {project_root}")
+        sys.exit(1)
+    print(f"✓ discord.js-selfbot-v13 loads ({timings['module_load_ms']:.0f} ms)")
+
+    # 3. Write resolved paths into the NanoBot config
+    if config_file.exists():
+        with open(config_file, "r") as f:
+            config = json.load(f)
+
+        channel = config.setdefault("channels", {}).setdefault("discord_selfbot", {})
+        # Keep whichever key style the file already uses
+        snake = "client_path" in channel or "allow_from" in channel
+        channel["nodePath" if not snake else "node_path"] = node_path
+        channel["clientPath" if not snake else "client_path"] = str(client_path)
+
+        with open(config_file, "w") as f:
+            json.dump(config, f, indent=2, ensure_ascii=False)
+        print(f"✓ Wrote node and client paths to {config_file}")
+    else:
+        print(f"⚠ Config not found: {config_file} - add these to discord_selfbot manually:")
+        print(f'    "nodePath": "{node_path}",')
+        print(f'    "clientPath": "{client_path}"')
+
+    # 4. Record timings for comparison with the channel's startup log line
+    record_file = config_file.parent / "discord-selfbot-preflight.json"
+    if record_file.parent.exists():
+        with open(record_file, "w") as f:
+            json.dump({
+                "checked_at": datetime.now().isoformat(timespec="seconds"),
+                "node_path": node_path,
+                "node_version": node_version,
+                "client_path": str(client_path),
+                "timings": timings,
+            }, f, indent=2)
+        print(f"✓ Recorded preflight timings in {record_file}")
+
+
+def install_channel(config_file: Path) -> None:
     """Install the Discord selfbot channel."""
     project_root = Path(__file__).parent.parent.resolve()
     site_packages = get_site_packages()
@@ -77,6 +169,16 @@ def install_channel() -> None:
         # Check if already installed
         if "DiscordSelfbotConfig" in content:
             print("✓ DiscordSelfbotConfig already in schema.py")
+            # Fields added since the first release of the channel
+            anchor = '    client_path: str = ""  # Path to discord-client.js script\n'
+            for name, line in SCHEMA_FIELDS:
+                if f"    {name}:" not in content and anchor in content:
+                    content = content.replace(anchor, anchor + line)
+                    with open(schema_file, "w") as f:
+                        f.write(content)
+                    print(f"✓ Added {name} to DiscordSelfbotConfig in {schema_file}")
+                if line in content:
+                    anchor = line
         else:
             # Add DiscordSelfbotConfig class after DiscordConfig
             config_class = '''
@@ -88,6 +190,9 @@ class DiscordSelfbotConfig(Base):
     token: str = ""  # User token from Discord (NOT bot token)
     allow_from: list[str] = Field(default_factory=list)  # Allowed user IDs
     client_path: str = ""  # Path to discord-client.js script
+    node_path: str = ""  # Path to node binary (written by preflight)
+    spool_dir: str = ""  # Shared attachment directory (default: /dev/shm)
+    max_attachment_mb: float = 10.0  # Larger inbound attachments are skipped
 '''
             # Find the DiscordConfig class and add after it
             pattern = r'(class DiscordConfig\(Base\):.*?intents: int = 37377\s*# GUILDS.*?\n\n)'
@@ -172,6 +277,9 @@ class DiscordSelfbotConfig(Base):
             f.write(content)
         print(f"✓ Added discord_selfbot initialization to {manager_file}")
     
+    # 5. Preflight node and write the resolved paths into the config
+    run_preflight(config_file)
+    
     print("\n✓ Discord selfbot channel installed successfully!")
     print("\nNext steps:")
     print("1. Add to your config.json:")
@@ -204,12 +312,22 @@ def uninstall_channel() -> None:
 def main() -> None:
     parser = argparse.ArgumentParser(description="Setup Discord selfbot channel for NanoBot")
     parser.add_argument("--uninstall", action="store_true", help="Uninstall the channel")
+    parser.add_argument(
+        "--preflight", action="store_true",
+        help="Only re-run the node preflight (e.g. after upgrading Node.js)",
+    )
+    parser.add_argument(
+        "--config", type=Path, default=DEFAULT_CONFIG,
+        help=f"NanoBot config to write resolved paths into (default: {DEFAULT_CONFIG})",
+    )
     args = parser.parse_args()
     
     if args.uninstall:
         uninstall_channel()
+    elif args.preflight:
+        run_preflight(args.config)
     else:
-        install_channel()
+        install_channel(args.config)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,49 @@
+"""Shared fixtures for tests of the Discord selfbot channel script."""
+
+import importlib.util
+import logging
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+CHANNEL_FILE = Path(__file__).resolve().parents[2] / "scripts" / "discord-selfbot-channel.py"
+
+
+class _BaseChannel:
+    """Minimal stand-in for nanobot.channels.base.BaseChannel."""
+
+    def __init__(self, config, bus):
+        self.config = config
+        self.bus = bus
+
+
+def _ensure_module(name: str, **attrs) -> None:
+    """Provide a bare module when the real dependency is not installed.
+
+    The code under test uses neither loguru nor nanobot beyond importing
+    them and constructing the channel.
+    """
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        module = types.ModuleType(name)
+        module.__dict__.update(attrs)
+        sys.modules[name] = module
+
+
+@pytest.fixture(scope="module")
+def channel_module():
+    _ensure_module("loguru", logger=logging.getLogger("discord_selfbot_test"))
+    _ensure_module("nanobot")
+    _ensure_module("nanobot.bus")
+    _ensure_module("nanobot.bus.events", OutboundMessage=object)
+    _ensure_module("nanobot.bus.queue", MessageBus=object)
+    _ensure_module("nanobot.channels")
+    _ensure_module("nanobot.channels.base", BaseChannel=_BaseChannel)
+
+    spec = importlib.util.spec_from_file_location("discord_selfbot_channel", CHANNEL_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,81 @@
+"""Tests for the outbound pacer in scripts/discord-selfbot-channel.py."""
+
+import pytest
+
+
+@pytest.fixture
+def pacer(channel_module):
+    return channel_module._Pacer()
+
+
+def test_unlimited_until_rate_limited(pacer):
+    for t in range(20):
+        pacer.delivered(float(t) / 10)
+    assert pacer.delay(2.0) == 0.0
+
+
+def test_learns_limit_and_window(channel_module, pacer):
+    for t in (0.0, 0.1, 0.2, 0.3, 0.4):
+        pacer.delivered(t)
+    pacer.rate_limited(0.5, 4.5, 5)
+
+    assert pacer.limit == 5
+    assert pacer.window == pytest.approx(5.0)
+    # Blocked until the bucket resets, then spaced by the learned window
+    assert pacer.delay(0.5) == pytest.approx(4.5 + channel_module.PACE_MARGIN_S)
+
+
+def test_stale_history_does_not_stretch_window(channel_module, pacer):
+    for t in (0.0, 0.1, 0.2, 0.3, 0.4):
+        pacer.delivered(t)
+    pacer.rate_limited(3600.0, 2.0, 5)
+
+    assert pacer.window <= channel_module.PACE_WINDOW_S
+    assert pacer.delay(3600.0) == pytest.approx(2.0 + channel_module.PACE_MARGIN_S)
+    assert pacer.delay(3602.1) == 0.0
+
+
+def test_window_is_clamped(channel_module, pacer):
+    for t in (0.0, 1.0, 2.0, 3.0, 4.0):
+        pacer.delivered(t)
+    pacer.rate_limited(4.9, 4000.0, 5)
+
+    assert pacer.window <= channel_module.PACE_MAX_WINDOW_S
+
+
+@pytest.mark.parametrize("limit", [-1, 0, None, "5"])
+def test_unusable_limit_is_ignored(pacer, limit):
+    pacer.rate_limited(10.0, 1.0, limit)
+
+    # Nothing sent recently, so there is nothing to infer a limit from
+    assert pacer.limit is None
+    assert pacer.delay(11.1) == 0.0
+
+
+def test_unusable_limit_keeps_learned_one(pacer):
+    for t in (0.0, 0.1, 0.2):
+        pacer.delivered(t)
+    pacer.rate_limited(0.3, 1.0, 3)
+    pacer.rate_limited(0.4, 1.0, -1)
+
+    assert pacer.limit == 3
+
+
+def test_block_does_not_touch_limit(pacer):
+    pacer.block(0.0, 2.0)
+
+    assert pacer.limit is None
+    assert pacer.delay(1.0) > 0.0
+    assert pacer.delay(2.1) == 0.0
+
+
+def test_learned_limit_expires(channel_module, pacer):
+    for t in (0.0, 0.1):
+        pacer.delivered(t)
+    pacer.rate_limited(0.2, 1.0, 2)
+    assert not pacer.idle(0.2)
+
+    later = 0.2 + channel_module.PACE_LIMIT_TTL_S + 1
+    assert pacer.idle(later)
+    assert pacer.limit is None
+    assert pacer.window == channel_module.PACE_WINDOW_S
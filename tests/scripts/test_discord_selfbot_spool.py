@@ -0,0 +1,93 @@
+"""Tests for the attachment spool in scripts/discord-selfbot-channel.py."""
+
+import os
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+
+def _age(path: Path, seconds: float) -> None:
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def test_schema_config_gets_per_user_default(channel_module, tmp_path, monkeypatch):
+    # NanoBot's schema model passes spool_dir="" instead of the script's default
+    config = SimpleNamespace(
+        enabled=True, token="t", allow_from=[], client_path="", node_path="",
+        spool_dir="", max_attachment_mb=10.0,
+    )
+    monkeypatch.chdir(tmp_path)
+    channel = channel_module.DiscordSelfbotChannel(config, bus=None)
+
+    root = channel._spool.root
+    assert root.is_absolute()
+    assert root == Path(channel_module._default_spool_dir())
+    assert str(os.getuid()) in root.name
+    assert root != Path.cwd()
+
+
+def test_sweep_only_removes_spool_names(channel_module, tmp_path):
+    spool = channel_module._Spool(str(tmp_path))
+    own = [
+        tmp_path / "0123456789ab-photo.png",
+        tmp_path / "1234567890-9876543210-photo.png",
+        tmp_path / "1234567890-9876543210-photo.png.part",
+    ]
+    foreign = [tmp_path / "notes.txt", tmp_path / "123-draft.txt", tmp_path / "photo.png"]
+    for path in own + foreign:
+        path.write_text("x")
+        _age(path, 7200)
+
+    spool.sweep(3600)
+
+    assert not any(path.exists() for path in own)
+    assert all(path.exists() for path in foreign)
+
+
+def test_sweep_keeps_fresh_and_tracked_files(channel_module, tmp_path):
+    spool = channel_module._Spool(str(tmp_path))
+    source = tmp_path / "source.txt"
+    source.write_text("x")
+    tracked = Path(spool.acquire(str(source)))
+    fresh = tmp_path / "1234567890-9876543210-new.png"
+    fresh.write_text("x")
+    _age(tracked, 7200)
+
+    spool.sweep(3600)
+
+    assert tracked.exists()
+    assert fresh.exists()
+
+
+def test_prepare_refuses_relative_root(channel_module):
+    with pytest.raises(OSError):
+        channel_module._Spool("").prepare()
+
+
+def test_prepare_creates_private_directory(channel_module, tmp_path):
+    root = tmp_path / "spool"
+    channel_module._Spool(str(root)).prepare()
+
+    assert root.stat().st_mode & 0o777 == 0o700
+
+
+def test_prepare_refuses_shared_directory(channel_module, tmp_path):
+    root = tmp_path / "spool"
+    root.mkdir(mode=0o755)
+    root.chmod(0o755)
+
+    with pytest.raises(PermissionError):
+        channel_module._Spool(str(root)).prepare()
+
+
+def test_prepare_refuses_symlink(channel_module, tmp_path):
+    target = tmp_path / "elsewhere"
+    target.mkdir(mode=0o700)
+    link = tmp_path / "spool"
+    link.symlink_to(target)
+
+    with pytest.raises(OSError):
+        channel_module._Spool(str(link)).prepare()